@@ -1,12 +1,43 @@
+import bisect
+import contextlib
+import itertools
 import json
+import mmap
+import os
+import sys
+import types
 import uuid
-from typing import List
+from collections import defaultdict
+from typing import DefaultDict, Dict, FrozenSet, Iterator, List, Mapping, Optional, Set, Union
+
+try:
+    import orjson  # Необязательная зависимость: ускоряет разбор library.json
+except ImportError:
+    orjson = None
+
+# Статусы интернируются: у всех книг один и тот же объект строки, а сравнение сводится к сравнению указателей
+STATUS_AVAILABLE: str = sys.intern("в наличии")
+STATUS_LOANED: str = sys.intern("выдана")
+ALLOWED_STATUSES: FrozenSet[str] = frozenset({STATUS_AVAILABLE, STATUS_LOANED})
+_ALLOWED_STATUSES_MSG: str = ", ".join((STATUS_AVAILABLE, STATUS_LOANED))  # Фиксированный порядок для подсказки
+
+# Поиск фраз по общей строке названий и авторов включается только для больших библиотек
+_CORPUS_MIN_BOOKS: int = 1000
+_CORPUS_SEPARATOR: str = "\x00"
+
+_SEARCH_CACHE_SIZE: int = 256  # Сколько последних запросов хранить в кэше поиска
 
 
 class Book:
     """Представляет книгу в библиотеке."""
 
-    def __init__(self, title: str, author: str, year: int, id: str = None, status: str = "в наличии") -> None:
+    # Фиксированный набор атрибутов вместо __dict__: меньше памяти на экземпляр и быстрее доступ к полям
+    __slots__ = ("id", "title", "author", "year", "_status", "_title_lower", "_author_lower", "_year_str", "_str_cache")
+
+    # Поля, которые сохраняются в library.json. Служебные кэши сюда не входят
+    _JSON_FIELDS = ("id", "title", "author", "year", "status")
+
+    def __init__(self, title: str, author: str, year: int, id: str = None, status: str = STATUS_AVAILABLE) -> None:
         """
         Инициализирует экземпляр книги.
         
@@ -14,14 +45,80 @@ class Book:
             title (str): Название книги.
             author (str): Автор книги.
             year (int): Год издания книги.
-            id (str, optional): Уникальный идентификатор книги (по умолчанию None).
+            id (str, optional): Уникальный идентификатор книги в формате UUID (по умолчанию None).
             status (str, optional): Статус книги ("в наличии" или "выдана").
         """
-        self.id: str = id or str(uuid.uuid4()) # Генерируем ID только если id=None
+        self.id: uuid.UUID = self._parse_id(id) if id else uuid.uuid4() # Генерируем ID только если id=None
         self.title: str = title
         self.author: str = author
-        self.year: int = year
-        self.status: str = status
+        # Старые версии сохраняли год строкой из ввода: числовые строки приводим к int,
+        # а произвольный текст (например, "1869 г.") оставляем как есть, чтобы файл загружался
+        try:
+            self.year: Union[int, str] = int(year)  # str только для нечисловых годов из старых файлов
+        except (TypeError, ValueError):
+            self.year = year
+        self.status = status
+        # Кэшируем значения для поиска, чтобы не пересчитывать их при каждом запросе
+        self._title_lower: str = title.lower()
+        self._author_lower: str = author.lower()
+        self._year_str: str = str(self.year)
+
+    @staticmethod
+    def _parse_id(id: Union[str, int, uuid.UUID]) -> uuid.UUID:
+        """
+        Приводит ID книги к UUID.
+
+        Старые версии принимали любой ID, поэтому значение не в формате UUID (например, "legacy-1"
+        или число из отредактированного вручную файла) не отбрасывается, а получает постоянный UUID,
+        вычисленный из исходного значения.
+
+        Args:
+            id (Union[str, int, uuid.UUID]): ID книги из файла или переданный явно.
+
+        Returns:
+            uuid.UUID: ID книги.
+        """
+        if isinstance(id, uuid.UUID):
+            return id
+        try:
+            return uuid.UUID(str(id))
+        except ValueError:
+            return uuid.uuid5(uuid.NAMESPACE_OID, str(id))
+
+    @property
+    def status(self) -> str:
+        """
+        Возвращает статус книги.
+
+        Returns:
+            str: Статус книги ("в наличии" или "выдана").
+        """
+        return self._status
+
+    @status.setter
+    def status(self, status: str) -> None:
+        """
+        Изменяет статус книги и сбрасывает кэш строкового представления.
+
+        Args:
+            status (str): Новый статус книги.
+        """
+        self._status: str = sys.intern(status)  # Значения из JSON приводим к общему объекту строки
+        self._str_cache: Optional[str] = None
+
+    def _asdict(self) -> dict:
+        """
+        Возвращает данные книги для сохранения в JSON.
+
+        Это единственное место, определяющее формат книги в файле: новые служебные
+        атрибуты в __slots__ не попадут в library.json, пока их нет в _JSON_FIELDS.
+
+        Returns:
+            dict: Словарь с полями из _JSON_FIELDS; ID приводится к строке.
+        """
+        data = {field: getattr(self, field) for field in self._JSON_FIELDS}
+        data["id"] = str(self.id)
+        return data
 
     def __str__(self) -> str:
         """
@@ -30,20 +127,191 @@ class Book:
         Returns:
             str: Отформатированная строка с детальной информацией о книге.
         """
-        return f"{self.id} {self.title} - {self.author}, {self.year} ({self.status})"
+        if self._str_cache is None:  # Строка меняется только вместе со статусом
+            self._str_cache = f"{self.id} {self.title} - {self.author}, {self.year} ({self.status})"
+        return self._str_cache
 
 # Класс для управления библиотекой
 class Library:
     """Представляет библиотеку книг."""
-    def __init__(self, filename: str = "library.json") -> None:
+    def __init__(self, filename: str = "library.json", durable: bool = True) -> None:
         """
         Инициализирует объект библиотеки, загружая данные из файла JSON.
 
         Args:
             filename (str): Имя файла для сохранения данных. По умолчанию "library.json".
+            durable (bool): Вызывать fsync при каждом сохранении. По умолчанию True.
         """
         self.filename: str = filename
-        self.books: List[Book] = self.load_books()  # Загружаем данные при создании объекта
+        self._durable: bool = durable  # Дожидаться записи файла на диск перед заменой
+        self._autosave: bool = True  # Сохранять файл сразу после каждого изменения
+        self._dirty: bool = False  # Есть несохранённые изменения
+        self.books: Dict[uuid.UUID, Book] = self.load_books()  # Загружаем данные при создании объекта
+
+    @property
+    def books(self) -> Mapping[uuid.UUID, Book]:
+        """
+        Возвращает книги библиотеки.
+
+        Словарь доступен только для чтения: изменять его нужно через add_book, remove_book
+        или присваивание books, иначе поисковые индексы разойдутся с книгами.
+
+        Returns:
+            Mapping[uuid.UUID, Book]: Книги по их ID в порядке добавления.
+        """
+        return types.MappingProxyType(self._books)
+
+    @books.setter
+    def books(self, books: Mapping[uuid.UUID, Book]) -> None:
+        """
+        Заменяет книги библиотеки и перестраивает поисковые индексы.
+
+        Args:
+            books (Mapping[uuid.UUID, Book]): Новые книги по их ID.
+        """
+        # Храним копию, чтобы изменения исходного словаря не обходили индексы; поиск и удаление по ID за O(1)
+        self._books: Dict[uuid.UUID, Book] = dict(books)
+        self._order: Dict[uuid.UUID, int] = {}  # Порядковый номер книги для сортировки результатов поиска
+        self._counter = itertools.count()
+        self._token_index: DefaultDict[str, Set[uuid.UUID]] = defaultdict(set)  # Слово названия/автора -> ID книг
+        self._year_index: DefaultDict[str, Set[uuid.UUID]] = defaultdict(set)  # Год издания -> ID книг
+        self._vocabulary: Optional[str] = None  # Все слова из self._token_index через "\n", строится при поиске
+        self._corpus: Optional[str] = None  # Названия и авторы всех книг одной строкой, строится при поиске фразы
+        self._corpus_starts: List[int] = []  # Смещение начала каждой книги в self._corpus
+        self._corpus_ids: List[uuid.UUID] = []  # ID книг в том же порядке, что и self._corpus_starts
+        self._search_cache: Dict[str, List[Book]] = {}  # Запрос -> результат, очищается при любом изменении книг
+        for book in books.values():
+            self._index_book(book)
+
+    def _index_book(self, book: Book) -> None:
+        """
+        Добавляет книгу во внутренние индексы.
+
+        Args:
+            book (Book): Книга для индексации.
+        """
+        book_id = book.id
+        self._corpus = None
+        self._search_cache.clear()
+        self._order[book_id] = next(self._counter)
+        for token in set(book._title_lower.split() + book._author_lower.split()):
+            if token not in self._token_index:
+                self._vocabulary = None
+            self._token_index[token].add(book_id)
+        self._year_index[book._year_str].add(book_id)
+
+    def _unindex_book(self, book: Book) -> None:
+        """
+        Удаляет книгу из внутренних индексов.
+
+        Args:
+            book (Book): Книга, которую нужно убрать из индексов.
+        """
+        book_id = book.id
+        self._corpus = None
+        self._search_cache.clear()
+        self._order.pop(book_id, None)
+        for token in set(book._title_lower.split() + book._author_lower.split()):
+            ids = self._token_index[token]
+            ids.discard(book_id)
+            if not ids:
+                del self._token_index[token]
+                self._vocabulary = None
+        year = book._year_str
+        self._year_index[year].discard(book_id)
+        if not self._year_index[year]:
+            del self._year_index[year]
+
+    def _changed(self) -> None:
+        """Отмечает наличие изменений и сохраняет их, если автосохранение включено."""
+        self._dirty = True
+        if self._autosave:
+            self.save_books()
+
+    @contextlib.contextmanager
+    def bulk(self) -> Iterator["Library"]:
+        """
+        Откладывает сохранение файла до конца блока with.
+
+        Все изменения внутри блока записываются в файл одним вызовом save_books.
+
+        Yields:
+            Library: Текущий объект библиотеки.
+        """
+        previous_autosave = self._autosave
+        self._autosave = False
+        try:
+            yield self
+        finally:
+            self._autosave = previous_autosave
+            if self._autosave and self._dirty:
+                self.save_books()
+
+    def _search_vocabulary(self, query_lower: str) -> Set[uuid.UUID]:
+        """
+        Ищет подстроку в словах названий и авторов.
+
+        Слова хранятся одной строкой через перевод строки, поэтому все вхождения находит
+        str.find на C, а не проверка каждого слова в цикле Python.
+
+        Args:
+            query_lower (str): Запрос в нижнем регистре без пробельных символов.
+
+        Returns:
+            Set[uuid.UUID]: ID книг, в словах которых встречается запрос.
+        """
+        if self._vocabulary is None:
+            self._vocabulary = "\n".join(self._token_index)
+        vocabulary = self._vocabulary
+        found_ids: Set[uuid.UUID] = set()
+        pos = vocabulary.find(query_lower)
+        while pos != -1:
+            start = vocabulary.rfind("\n", 0, pos) + 1
+            end = vocabulary.find("\n", pos)
+            if end == -1:
+                end = len(vocabulary)
+            found_ids |= self._token_index[vocabulary[start:end]]
+            pos = vocabulary.find(query_lower, end)  # Следующее вхождение ищем уже в другом слове
+        return found_ids
+
+    def _build_corpus(self) -> None:
+        """Собирает названия и авторов всех книг в одну строку для поиска фраз."""
+        parts: List[str] = []
+        self._corpus_starts = []
+        self._corpus_ids = []
+        offset = 0
+        for book in self.books.values():
+            part = book._title_lower + _CORPUS_SEPARATOR + book._author_lower + _CORPUS_SEPARATOR
+            parts.append(part)
+            self._corpus_starts.append(offset)
+            self._corpus_ids.append(book.id)
+            offset += len(part)
+        self._corpus = "".join(parts)
+
+    def _search_corpus(self, query_lower: str) -> Set[uuid.UUID]:
+        """
+        Ищет подстроку в названиях и авторах через общую строку всех книг.
+
+        Вместо проверки каждой книги в цикле Python поиск выполняет str.find на C,
+        а номер книги по позиции совпадения находится двоичным поиском.
+
+        Args:
+            query_lower (str): Запрос в нижнем регистре, не содержащий разделителя.
+
+        Returns:
+            Set[uuid.UUID]: ID найденных книг.
+        """
+        if self._corpus is None:
+            self._build_corpus()
+        corpus, starts = self._corpus, self._corpus_starts
+        found_ids: Set[uuid.UUID] = set()
+        pos = corpus.find(query_lower)
+        while pos != -1 and pos < len(corpus):
+            i = bisect.bisect_right(starts, pos) - 1
+            found_ids.add(self._corpus_ids[i])
+            # Остаток текущей книги пропускаем: она уже найдена
+            pos = corpus.find(query_lower, starts[i + 1] if i + 1 < len(starts) else len(corpus))
+        return found_ids
 
     def add_book(self, title: str, author: str, year: int) -> None:
         """
@@ -55,8 +323,9 @@ class Library:
             year (int): Год издания книги.
         """
         book = Book(title, author, year)
-        self.books.append(book)
-        self.save_books()  # Сохраняем данные после добавления
+        self._books[book.id] = book
+        self._index_book(book)
+        self._changed()  # Сохраняем данные после добавления
         print(f"Книга '{title}' успешно добавлена.")
 
     def remove_book(self, book_id: str) -> None:
@@ -66,31 +335,69 @@ class Library:
         Args:
             book_id (str): Уникальный идентификатор книги в формате UUID.
         """
-        for book in self.books:
-            if str(book.id) == book_id:
-                self.books.remove(book)
-                print(f"Книга с ID {book_id} успешно удалена.")
-                self.save_books()  # Сохраняем данные после удаления
-                return
-        print(f"Книга с ID {book_id} не найдена.")
+        try:
+            book_id_uuid: uuid.UUID = uuid.UUID(book_id)
+        except ValueError:
+            print("Неверный формат ID книги.")
+            return
 
-    def find_book(self, query: str) -> None:
+        book = self._books.pop(book_id_uuid, None)
+        if book is None:
+            print(f"Книга с ID {book_id} не найдена.")
+            return
+        self._unindex_book(book)
+        print(f"Книга с ID {book_id} успешно удалена.")
+        self._changed()  # Сохраняем данные после удаления
+
+    def search(self, query: str) -> List[Book]:
         """
         Ищет книги по названию, автору или году издания.
 
+        Результаты кэшируются по тексту запроса до следующего добавления или удаления книги.
+
+        Args:
+            query (str): Ключевое слово для поиска (название, автор или год издания).
+
+        Returns:
+            List[Book]: Найденные книги в порядке добавления в библиотеку.
+        """
+        cached = self._search_cache.get(query)
+        if cached is not None:
+            return list(cached)
+
+        query_lower = query.lower()
+        if query_lower.split() == [query_lower]:
+            # Запрос без пробелов может совпасть только внутри одного слова,
+            # поэтому достаточно просмотреть словарь слов, а не все книги
+            found_ids: Set[uuid.UUID] = self._search_vocabulary(query_lower) | self._year_index.get(query, set())
+            found_books = [self.books[book_id] for book_id in sorted(found_ids, key=self._order.__getitem__)]
+        elif len(self.books) >= _CORPUS_MIN_BOOKS and _CORPUS_SEPARATOR not in query_lower:
+            found_ids = self._search_corpus(query_lower) | self._year_index.get(query, set())
+            found_books = [self.books[book_id] for book_id in sorted(found_ids, key=self._order.__getitem__)]
+        else:
+            found_books = [
+                book for book in self.books.values()
+                if query_lower in book._title_lower
+                or query_lower in book._author_lower
+                or query == book._year_str
+            ]
+
+        if len(self._search_cache) >= _SEARCH_CACHE_SIZE:
+            del self._search_cache[next(iter(self._search_cache))]  # Вытесняем самый старый запрос
+        self._search_cache[query] = found_books
+        return list(found_books)
+
+    def find_book(self, query: str) -> None:
+        """
+        Ищет книги по названию, автору или году издания и выводит результат.
+
         Args:
             query (str): Ключевое слово для поиска (название, автор или год издания).
         """
-        found_books = [
-            book for book in self.books
-            if query.lower() in book.title.lower()
-            or query.lower() in book.author.lower()
-            or query == str(book.year)
-        ]
+        found_books = self.search(query)
         if found_books:
-            print("Найденные книги:")
-            for book in found_books:
-                print(book)
+            # Выводим весь список одной записью вместо отдельного print на каждую книгу
+            sys.stdout.write("Найденные книги:\n" + "\n".join(map(str, found_books)) + "\n")
         else:
             print("Книги по вашему запросу не найдены.")
 
@@ -103,9 +410,7 @@ class Library:
         if not self.books:
             print("Библиотека пуста.")
         else:
-            print("Список книг в библиотеке:")
-            for book in self.books:
-                print(book)
+            sys.stdout.write("Список книг в библиотеке:\n" + "\n".join(map(str, self.books.values())) + "\n")
 
     def update_status(self, book_id: str, status: str) -> None:
         """
@@ -115,8 +420,6 @@ class Library:
             book_id (str): Уникальный идентификатор книги в формате UUID.
             status (str): Новый статус книги. Допустимые значения: "в наличии", "выдана".
         """
-        allowed_statuses = {"в наличии", "выдана"}
-
         # Проверка формата UUID
         try:
             book_id_uuid: uuid.UUID = uuid.UUID(book_id)
@@ -125,40 +428,79 @@ class Library:
             return
         
         # Проверка на допустимые статусы
-        if status not in allowed_statuses:
-            print(f"Недопустимый статус. Возможные варианты: {', '.join(allowed_statuses)}.")
+        if status not in ALLOWED_STATUSES:
+            print(f"Недопустимый статус. Возможные варианты: {_ALLOWED_STATUSES_MSG}.")
             return
 
         # Обновляем статус книги, если она найдена
-        for book in self.books:
-            if book.id == book_id_uuid:
-                book.status = status
-                self.save_books()
-                print(f"Статус книги '{book.title}' обновлён на '{status}'.")
-                return
+        book = self.books.get(book_id_uuid)
+        if book is None:
+            print("Книга с таким ID не найдена.")
+            return
 
-        print("Книга с таким ID не найдена.")
+        book.status = status
+        self._changed()
+        print(f"Статус книги '{book.title}' обновлён на '{status}'.")
 
 
     def save_books(self) -> None:
-        """Сохраняет данные библиотеки в файл JSON."""
-        with open(self.filename, "w", encoding="utf-8") as f:
-            json.dump([vars(book) for book in self.books], f, ensure_ascii=False, indent=4)
-
+        """
+        Сохраняет данные библиотеки в файл JSON.
 
-    def load_books(self) -> List[Book]:
+        Книги записываются в файл по одной, без построения промежуточного списка словарей.
+        Данные сначала пишутся во временный файл, который затем атомарно заменяет основной,
+        поэтому прерванное сохранение не повреждает library.json.
+        """
+        tmp_filename = self.filename + ".tmp"
+        try:
+            with open(tmp_filename, "w", encoding="utf-8") as f:
+                f.write("[")
+                for i, book in enumerate(self.books.values()):
+                    f.write(",\n    " if i else "\n    ")
+                    book_data = book._asdict()
+                    # Сдвигаем вложенные строки, чтобы формат совпадал с json.dump(..., indent=4) для всего списка
+                    f.write(json.dumps(book_data, ensure_ascii=False, indent=4).replace("\n", "\n    "))
+                f.write("\n]" if self.books else "]")
+                f.flush()
+                if self._durable:
+                    os.fsync(f.fileno())  # Один fsync на сохранение
+            os.replace(tmp_filename, self.filename)
+        except BaseException:
+            # Не оставляем недописанный временный файл рядом с library.json
+            try:
+                os.unlink(tmp_filename)
+            except FileNotFoundError:
+                pass
+            raise
+        self._dirty = False
+
+
+    def load_books(self) -> Dict[uuid.UUID, Book]:
         """
         Загружает данные библиотеки из файла JSON.
         
         Returns:
-            list_books (List[Book]): список книг либо пустой список"""
+            dict_books (Dict[uuid.UUID, Book]): книги по их ID либо пустой словарь"""
         try:
-            with open(self.filename, "r", encoding="utf-8") as f:
-                data: List[dict] = json.load(f)
-                list_books: List[Book] = [Book(**book_data) for book_data in data]
-                return list_books
+            with open(self.filename, "rb") as f:
+                if os.fstat(f.fileno()).st_size == 0:
+                    return {}  # Пустой файл нельзя отобразить в память
+                # Отображаем файл в память: orjson разбирает его без копирования в промежуточную строку
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    # orjson.JSONDecodeError наследуется от json.JSONDecodeError, поэтому обработка ошибок общая
+                    if orjson:
+                        with memoryview(mm) as buffer:
+                            data: List[dict] = orjson.loads(buffer)
+                    else:
+                        data = json.loads(mm[:])
+            dict_books: Dict[uuid.UUID, Book] = {}
+            for i, book_data in enumerate(data):
+                book = Book(**book_data)
+                dict_books[book.id] = book
+                data[i] = None  # Освобождаем словарь сразу после создания книги
+            return dict_books
         except (FileNotFoundError, json.JSONDecodeError):
-            return []  # Возвращаем пустой список, если файл не найден или поврежден
+            return {}  # Возвращаем пустой словарь, если файл не найден или поврежден
 
 # Основное меню приложения
 def main() -> None:
@@ -181,7 +523,12 @@ def main() -> None:
             case "1":
                 title = input("Введите название книги: ")
                 author = input("Введите автора книги: ")
-                year = input("Введите год издания книги: ")
+                while True:  # Повторяем запрос года, не теряя введённые название и автора
+                    try:
+                        year = int(input("Введите год издания книги: "))
+                        break
+                    except ValueError:
+                        print("Год издания должен быть целым числом.")
                 library.add_book(title, author, year)
 
             case "2":
@@ -1,9 +1,11 @@
+import json
 import unittest
+import uuid
 from io import StringIO
 from pathlib import Path
 from unittest import mock
 
-from main import Book, Library
+from main import STATUS_LOANED, Book, Library
 
 
 class TestBook(unittest.TestCase):
@@ -16,7 +18,7 @@ class TestBook(unittest.TestCase):
         self.assertEqual(book.year, 1869)
         self.assertEqual(book.status, "в наличии")
         self.assertIsNotNone(book.id)  # Проверяем, что ID сгенерировался
-        self.assertTrue(isinstance(book.id, str)) # Проверяем тип ID
+        self.assertTrue(isinstance(book.id, uuid.UUID)) # Проверяем тип ID
 
 
     def test_book_creation_with_id(self):
@@ -24,7 +26,14 @@ class TestBook(unittest.TestCase):
         book_id = "1274d8e0-3b49-41eb-b3f6-1ee5fd38aae1"
         book = Book("Анна Каренина", "Лев Толстой", 1877, id=book_id)
         self.assertEqual(book.title, "Анна Каренина")
-        self.assertEqual(book.id, book_id)
+        self.assertEqual(book.id, uuid.UUID(book_id))
+
+
+    def test_book_creation_with_string_year(self):
+        """Проверяет, что год издания, переданный строкой, приводится к int."""
+        book = Book("Бесы", "Фёдор Достоевский", "1872")
+        self.assertEqual(book.year, 1872)
+        self.assertEqual(book._asdict()["year"], 1872)
 
 
     def test_book_creation_with_status(self):
@@ -39,6 +48,25 @@ class TestBook(unittest.TestCase):
         expected_str = f"{book.id} Мёртвые души - Николай Гоголь, 1842 (в наличии)"
         self.assertEqual(str(book), expected_str)
 
+        book.status = "выдана"  # Смена статуса обновляет строковое представление
+        self.assertEqual(str(book), f"{book.id} Мёртвые души - Николай Гоголь, 1842 (выдана)")
+
+
+    def test_book_has_no_dict(self):
+        """Проверяет, что книга хранит атрибуты в __slots__, а не в __dict__."""
+        book = Book("Мёртвые души", "Николай Гоголь", 1842)
+        self.assertFalse(hasattr(book, "__dict__"))
+        with self.assertRaises(AttributeError):
+            book.publisher = "Университетская типография"
+
+
+    def test_book_asdict(self):
+        """Проверяет словарь книги для сохранения в JSON."""
+        book = Book("Мёртвые души", "Николай Гоголь", 1842)
+        str(book)  # Заполняем кэш строкового представления
+        expected = {"id": str(book.id), "title": "Мёртвые души", "author": "Николай Гоголь", "year": 1842, "status": "в наличии"}
+        self.assertEqual(book._asdict(), expected)
+
 
 class TestLibrary(unittest.TestCase):
     """Тестовый класс для проверки функциональности класса Library."""
@@ -62,18 +90,20 @@ class TestLibrary(unittest.TestCase):
         """Проверяет добавление книги в библиотеку."""
         self.library.add_book("Война и мир", "Лев Толстой", 1869)
         self.assertEqual(len(self.library.books), 1)
-        self.assertEqual(self.library.books[0].title, "Война и мир")
+        self.assertEqual(next(iter(self.library.books.values())).title, "Война и мир")
 
     def test_remove_book(self):
         """Проверяет удаление книги из библиотеки."""
         book1 = Book("Война и мир", "Лев Толстой", 1869)
-        self.library.books = [book1]
+        self.library.books = {book1.id: book1}
         self.library.remove_book(str(book1.id))
         self.assertEqual(len(self.library.books), 0)
 
         # Попытка удалить несуществующую книгу
         self.library.remove_book("nonexistent_id")
         self.assertEqual(len(self.library.books), 0)
+        self.library.remove_book(str(book1.id))
+        self.assertEqual(len(self.library.books), 0)
 
 
     def test_find_book(self):
@@ -84,12 +114,12 @@ class TestLibrary(unittest.TestCase):
         self.assertEqual(len(self.library.books), 2)
         with mock.patch('sys.stdout', new_callable=lambda: StringIO()) as stdout: #используется лямбда-функция для создания экземпляра класса StringIO
             self.library.find_book("Толстой") # поиск по автору
-        expected_str = f"Найденные книги:\n{self.library.books[0].id} Война и мир - Лев Толстой, 1869 (в наличии)\n{self.library.books[1].id} Анна Каренина - Лев Толстой, 1877 (в наличии)\n"
+        expected_str = f"Найденные книги:\n{next(iter(self.library.books.values())).id} Война и мир - Лев Толстой, 1869 (в наличии)\n{list(self.library.books.values())[1].id} Анна Каренина - Лев Толстой, 1877 (в наличии)\n"
         self.assertEqual(stdout.getvalue(), expected_str)
 
         with mock.patch('sys.stdout', new_callable=lambda: StringIO()) as stdout: #используется лямбда-функция для создания экземпляра класса StringIO
             self.library.find_book("1877") # поиск по году
-        expected_str = f"Найденные книги:\n{self.library.books[1].id} Анна Каренина - Лев Толстой, 1877 (в наличии)\n"
+        expected_str = f"Найденные книги:\n{list(self.library.books.values())[1].id} Анна Каренина - Лев Толстой, 1877 (в наличии)\n"
         self.assertEqual(stdout.getvalue(), expected_str)
 
         with mock.patch('sys.stdout', new_callable=lambda: StringIO()) as stdout: #используется лямбда-функция для создания экземпляра класса StringIO
@@ -98,26 +128,199 @@ class TestLibrary(unittest.TestCase):
         self.assertEqual(stdout.getvalue(), expected_str)
 
 
+    def test_search(self):
+        """Проверяет, что search возвращает список книг и учитывает изменения библиотеки."""
+        self.library.add_book("Война и мир", "Лев Толстой", 1869)
+        war_and_peace = next(iter(self.library.books.values()))
+        self.assertEqual(self.library.search("толстой"), [war_and_peace])
+
+        # Изменение возвращённого списка не портит кэш
+        self.library.search("толстой").clear()
+        self.assertEqual(self.library.search("толстой"), [war_and_peace])
+
+        # Добавление и удаление книги сбрасывают кэш
+        self.library.add_book("Анна Каренина", "Лев Толстой", 1877)
+        anna = list(self.library.books.values())[1]
+        self.assertEqual(self.library.search("толстой"), [war_and_peace, anna])
+        self.library.remove_book(str(war_and_peace.id))
+        self.assertEqual(self.library.search("толстой"), [anna])
+        self.assertEqual(self.library.search("Преступление"), [])
+
+
+    def test_books_read_only(self):
+        """Проверяет, что книги нельзя изменить в обход индексов поиска."""
+        self.library.add_book("Война и мир", "Лев Толстой", 1869)
+        book = next(iter(self.library.books.values()))
+        with self.assertRaises(AttributeError):
+            self.library.books.pop(book.id)
+        with self.assertRaises(TypeError):
+            self.library.books[uuid.uuid4()] = book
+        self.assertEqual(self.library.search("толстой"), [book])
+
+
+    def test_find_book_index(self):
+        """Проверяет поиск по части слова, по фразе и после удаления книги."""
+        self.library.add_book("Война и мир", "Лев Толстой", 1869)
+        self.library.add_book("Анна Каренина", "Лев Толстой", 1877)
+        war_and_peace, anna = self.library.books.values()
+
+        with mock.patch('sys.stdout', new_callable=lambda: StringIO()) as stdout:
+            self.library.find_book("карен") # поиск по части слова
+        self.assertEqual(stdout.getvalue(), f"Найденные книги:\n{anna}\n")
+
+        with mock.patch('sys.stdout', new_callable=lambda: StringIO()) as stdout:
+            self.library.find_book("война и") # поиск по фразе из нескольких слов
+        self.assertEqual(stdout.getvalue(), f"Найденные книги:\n{war_and_peace}\n")
+
+        self.library.remove_book(str(war_and_peace.id))
+        with mock.patch('sys.stdout', new_callable=lambda: StringIO()) as stdout:
+            self.library.find_book("1869") # удалённая книга больше не находится
+        self.assertEqual(stdout.getvalue(), "Книги по вашему запросу не найдены.\n")
+
+        self.library.add_book("Воскресение", "Лев Толстой", 1899)
+        resurrection = list(self.library.books.values())[-1]
+        with mock.patch('sys.stdout', new_callable=lambda: StringIO()) as stdout:
+            self.library.find_book("воскрес") # новое слово появляется в поиске после добавления книги
+        self.assertEqual(stdout.getvalue(), f"Найденные книги:\n{resurrection}\n")
+
+
+    def test_find_book_corpus(self):
+        """Проверяет поиск фраз через общую строку названий и авторов в большой библиотеке."""
+        with mock.patch("main._CORPUS_MIN_BOOKS", 0), self.library.bulk():
+            self.library.add_book("Война и мир", "Лев Толстой", 1869)
+            self.library.add_book("Анна Каренина", "Лев Толстой", 1877)
+            self.library.add_book("Мир и война", "Неизвестный автор", 1900)
+            war_and_peace, anna, peace_and_war = self.library.books.values()
+
+            with mock.patch('sys.stdout', new_callable=lambda: StringIO()) as stdout:
+                self.library.find_book("лев толстой") # фраза встречается у двух книг
+            self.assertEqual(stdout.getvalue(), f"Найденные книги:\n{war_and_peace}\n{anna}\n")
+
+            with mock.patch('sys.stdout', new_callable=lambda: StringIO()) as stdout:
+                self.library.find_book("мир лев") # совпадение на стыке названия и автора не засчитывается
+            self.assertEqual(stdout.getvalue(), "Книги по вашему запросу не найдены.\n")
+
+            self.library.remove_book(str(anna.id))
+            with mock.patch('sys.stdout', new_callable=lambda: StringIO()) as stdout:
+                self.library.find_book("и ") # после удаления строка поиска перестраивается
+            self.assertEqual(stdout.getvalue(), f"Найденные книги:\n{war_and_peace}\n{peace_and_war}\n")
+
+
     def test_display_books(self):
         """Проверяет отображение списка книг."""
         self.library.add_book("Война и мир", "Лев Толстой", 1869)
         with mock.patch('sys.stdout', new_callable=lambda: StringIO()) as stdout: #используется лямбда-функция для создания экземпляра класса StringIO
             self.library.display_books()
-        expected_str = f"Список книг в библиотеке:\n{self.library.books[0].id} Война и мир - Лев Толстой, 1869 (в наличии)\n"
+        expected_str = f"Список книг в библиотеке:\n{next(iter(self.library.books.values())).id} Война и мир - Лев Толстой, 1869 (в наличии)\n"
         self.assertEqual(stdout.getvalue(), expected_str)
 
 
+    def test_update_status(self):
+        """Проверяет обновление статуса книги по ID."""
+        self.library.add_book("Война и мир", "Лев Толстой", 1869)
+        book = next(iter(self.library.books.values()))
+        self.library.update_status(str(book.id), "выдана")
+        self.assertEqual(book.status, "выдана")
+
+        # Недопустимый статус не меняет книгу
+        with mock.patch('sys.stdout', new_callable=lambda: StringIO()) as stdout:
+            self.library.update_status(str(book.id), "потеряна")
+        self.assertEqual(stdout.getvalue(), "Недопустимый статус. Возможные варианты: в наличии, выдана.\n")
+        self.assertEqual(book.status, "выдана")
+
+        # Статус сохраняется в файл
+        loaded_library = Library(str(self.temp_file))
+        self.assertIn(book.id, loaded_library.books)
+        self.assertEqual(loaded_library.books[book.id].status, "выдана")
+        self.assertIs(loaded_library.books[book.id].status, STATUS_LOANED)  # Статус из файла интернирован
+
+
     def test_save_and_load_books(self):
         """Проверяет сохранение и загрузку данных библиотеки в файл."""
         book1 = Book("Преступление и наказание", "Фёдор Достоевский", 1866)
         book2 = Book("Идиот", "Фёдор Достоевский", 1869)
-        self.library.books = [book1, book2]
+        self.library.books = {book1.id: book1, book2.id: book2}
         self.library.save_books()
 
         loaded_library = Library(str(self.temp_file))
         self.assertEqual(len(loaded_library.books), 2)
-        self.assertEqual(loaded_library.books[0].title, "Преступление и наказание")
-        self.assertEqual(loaded_library.books[1].title, "Идиот")
+        self.assertEqual(next(iter(loaded_library.books.values())).title, "Преступление и наказание")
+        self.assertEqual(list(loaded_library.books.values())[1].title, "Идиот")
+
+        # В файл попадают только поля книги, без служебных кэшей
+        with open(self.temp_file, encoding="utf-8") as f:
+            saved = json.load(f)
+        self.assertEqual(set(saved[0]), {"id", "title", "author", "year", "status"})
+
+    def test_save_books_atomic(self):
+        """Проверяет, что сбой при сохранении не повреждает существующий файл."""
+        self.library.add_book("Война и мир", "Лев Толстой", 1869)
+        saved = self.temp_file.read_text(encoding="utf-8")
+
+        with mock.patch("main.os.replace", side_effect=OSError), self.assertRaises(OSError):
+            self.library.add_book("Анна Каренина", "Лев Толстой", 1877)
+        self.assertFalse(Path(str(self.temp_file) + ".tmp").exists())  # Временный файл удалён
+        self.assertEqual(self.temp_file.read_text(encoding="utf-8"), saved)
+
+    def test_save_books_without_fsync(self):
+        """Проверяет, что при durable=False файл сохраняется без fsync."""
+        library = Library(str(self.temp_file), durable=False)
+        with mock.patch("main.os.fsync") as fsync:
+            library.add_book("Война и мир", "Лев Толстой", 1869)
+        fsync.assert_not_called()
+        self.assertEqual(len(Library(str(self.temp_file)).books), 1)
+
+    def test_bulk_saves_once(self):
+        """Проверяет, что внутри bulk() файл сохраняется один раз при выходе из блока."""
+        with mock.patch.object(Library, "save_books", autospec=True, side_effect=Library.save_books) as save_books:
+            with self.library.bulk():
+                self.library.add_book("Война и мир", "Лев Толстой", 1869)
+                self.library.add_book("Анна Каренина", "Лев Толстой", 1877)
+                self.assertFalse(self.temp_file.exists())  # Внутри блока файл ещё не записан
+        self.assertEqual(save_books.call_count, 1)
+
+        loaded_library = Library(str(self.temp_file))
+        self.assertEqual(len(loaded_library.books), 2)
+
+    def test_load_books_without_orjson(self):
+        """Проверяет загрузку данных стандартным модулем json, если orjson не установлен."""
+        self.library.add_book("Война и мир", "Лев Толстой", 1869)
+        with mock.patch("main.orjson", None):
+            loaded_library = Library(str(self.temp_file))
+        self.assertEqual(len(loaded_library.books), 1)
+        self.assertEqual(next(iter(loaded_library.books.values())).title, "Война и мир")
+
+    def test_load_non_numeric_year(self):
+        """Проверяет загрузку файла старой версии с нечисловым годом издания."""
+        self.temp_file.write_text(
+            '[{"id": "1274d8e0-3b49-41eb-b3f6-1ee5fd38aae1", "title": "Война и мир", '
+            '"author": "Лев Толстой", "year": "1869 г.", "status": "в наличии"}]',
+            encoding="utf-8",
+        )
+        loaded_library = Library(str(self.temp_file))
+        self.assertEqual(len(loaded_library.books), 1)
+        self.assertEqual(next(iter(loaded_library.books.values())).year, "1869 г.")
+
+    def test_load_legacy_id(self):
+        """Проверяет, что записи с ID не в формате UUID загружаются и не теряются при сохранении."""
+        self.temp_file.write_text(
+            '[{"id": "legacy-1", "title": "Война и мир", "author": "Лев Толстой", "year": 1869, "status": "в наличии"}, '
+            '{"id": 5, "title": "Анна Каренина", "author": "Лев Толстой", "year": 1877, "status": "в наличии"}]',
+            encoding="utf-8",
+        )
+        library = Library(str(self.temp_file))
+        self.assertEqual(len(library.books), 2)
+        war_and_peace, anna = library.books.values()
+        self.assertEqual(war_and_peace.id, uuid.uuid5(uuid.NAMESPACE_OID, "legacy-1"))  # Постоянный ID
+
+        library.add_book("Воскресение", "Лев Толстой", 1899)  # Изменение перезаписывает файл
+        loaded_library = Library(str(self.temp_file))
+        self.assertEqual(len(loaded_library.books), 3)
+        self.assertEqual(loaded_library.books[war_and_peace.id].title, "Война и мир")
+        self.assertEqual(loaded_library.books[anna.id].title, "Анна Каренина")
+
+        loaded_library.remove_book(str(anna.id))  # Книгу со старым ID можно удалить
+        self.assertNotIn(anna.id, loaded_library.books)
 
     def test_load_empty_file(self):
         """Проверяет загрузку данных из пустого файла."""
@@ -125,6 +328,16 @@ class TestLibrary(unittest.TestCase):
         loaded_library = Library(str(self.temp_file))
         self.assertEqual(len(loaded_library.books), 0) # Проверяем, что библиотека пуста 
 
+    def test_load_corrupted_file(self):
+        """Проверяет загрузку данных из повреждённого файла."""
+        self.temp_file.write_text('[{"title": "Война и мир"', encoding="utf-8")
+        loaded_library = Library(str(self.temp_file))
+        self.assertEqual(len(loaded_library.books), 0)
+
+        with mock.patch("main.orjson", None):  # То же самое при разборе стандартным json
+            loaded_library = Library(str(self.temp_file))
+        self.assertEqual(len(loaded_library.books), 0)
+
 
 if __name__ == '__main__':
     unittest.main()